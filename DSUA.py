@@ -6,15 +6,15 @@ This script analyzes Trend Micro Deep Security module usage across different env
 and generates comprehensive reports, including metrics, visualizations, and an HTML report.
 """
 import sys
-from modules.logging_config import setup_logging
+from modules.logging_config import setup_logging, shutdown_logging
 from modules.analyzer import SecurityModuleAnalyzer
 
 def main():
     """Main function with time range parameters."""
+    # Set up logging
+    logger, log_listener = setup_logging()
+
     try:
-        # Set up logging
-        logger = setup_logging()
-        
         # Initialize analyzer with optional time range
         analyzer = SecurityModuleAnalyzer(
             start_date=None,  # Optional: specify start date in 'YYYY-MM-DD' format
@@ -27,6 +27,8 @@ def main():
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}")
         sys.exit(1)
+    finally:
+        shutdown_logging(log_listener)
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,15 @@
 """
 Core analyzer functionality for the Deep Security Usage Analyzer.
 """
-import json
 import logging
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Collection, Optional
 
 from .data_loader import load_and_preprocess_data
 from .metrics_calculator import calculate_all_metrics
-from ..utils import convert_to_serializable
+from ..utils import write_json
 from ..visualizations import create_visualizations
 from ..report_generator import generate_reports
 
@@ -23,7 +22,8 @@ class SecurityModuleAnalyzer:
     Analyzes Trend Micro Deep Security module usage across different environments and generates comprehensive reports.
     """
     
-    def __init__(self, start_date: Optional[str] = None, end_date: Optional[str] = None):
+    def __init__(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 report_formats: Optional[Collection[str]] = None):
         """
         Initialize the Trend Micro Deep Security Usage Analyzer.
         Sets up directories for input and output, and prepares data structures for analysis.
@@ -31,6 +31,7 @@ class SecurityModuleAnalyzer:
         Args:
             start_date (Optional[str]): Start date for analysis in YYYY-MM-DD format
             end_date (Optional[str]): End date for analysis in YYYY-MM-DD format
+            report_formats (Optional[Collection[str]]): Report formats to generate ('html', 'pdf'); all when None
         """
         # Use current directory as default
         self.directory = Path.cwd()
@@ -46,6 +47,9 @@ class SecurityModuleAnalyzer:
         # Add time range parameters
         self.start_date = pd.to_datetime(start_date) if start_date else None
         self.end_date = pd.to_datetime(end_date) if end_date else None
+        
+        # Skip generating reports no one needs, such as the PDF while iterating on the HTML
+        self.report_formats = report_formats
 
     def analyze(self) -> None:
         """
@@ -75,16 +79,26 @@ class SecurityModuleAnalyzer:
             update_progress("Generating visualizations...")
             visualizations = create_visualizations(self.metrics, self.output_dir)
 
-            # Step 4: Generate report
-            update_progress("Generating final report...")
-            generate_reports(self.metrics, self.output_dir, visualizations)
-
-            # Step 5: Save metrics to JSON
-            update_progress("Saving metrics...")
-            serializable_metrics = convert_to_serializable(self.metrics)
-            with open(self.output_dir / 'metrics.json', 'w') as json_file:
-                json.dump(serializable_metrics, json_file, indent=4)
-                logger.info(f"✓ Saved metrics to '{self.output_dir / 'metrics.json'}'")
+            # Steps 4 and 5 write independent files, so save metrics.json in the background
+            # while the reports are generated; neither modifies the metrics
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                metrics_future = executor.submit(write_json, self.metrics, self.output_dir / 'metrics.json')
+
+                # Step 4: Generate report
+                update_progress("Generating final report...")
+                try:
+                    generate_reports(self.metrics, self.output_dir, visualizations, self.report_formats)
+                except Exception:
+                    # Wait for metrics.json anyway and log its own error, so neither failure is lost
+                    metrics_error = metrics_future.exception()
+                    if metrics_error is not None:
+                        logger.error(f"Failed to save metrics: {str(metrics_error)}")
+                    raise
+
+                # Step 5: Save metrics to JSON
+                update_progress("Saving metrics...")
+                metrics_future.result()
+            logger.info(f"✓ Saved metrics to '{self.output_dir / 'metrics.json'}'")
 
             # Print final summary
             print("\nAnalysis Complete!")
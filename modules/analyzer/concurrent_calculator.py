@@ -2,12 +2,101 @@
 Concurrent usage calculation functionality for the Deep Security Usage Analyzer.
 """
 import pandas as pd
+import numpy as np
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-def calculate_concurrent_usage(df: pd.DataFrame, start_date: Optional[pd.Timestamp] = None, 
+def _zero_length_counts(starts: np.ndarray, stops: np.ndarray,
+                        sorted_starts: np.ndarray, sorted_stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the instants of zero-length intervals and how many intervals are open at each, including the interval itself."""
+    instants = np.sort(starts[starts == stops])
+
+    # Intervals that started before the instant and stop after it; the zero-length intervals
+    # at the instant are added back since they stop there without having started before it
+    spanning = (np.searchsorted(sorted_starts, instants, side='left')
+                - np.searchsorted(sorted_stops, instants, side='right')
+                + np.searchsorted(instants, instants, side='right')
+                - np.searchsorted(instants, instants, side='left'))
+    return instants, spanning + 1
+
+def max_concurrent_intervals(starts: np.ndarray, stops: np.ndarray) -> int:
+    """
+    Calculate the maximum number of overlapping intervals.
+
+    Intervals are half-open, so an interval starting at the same moment another one stops does not overlap it.
+    A zero-length interval is open only at its own instant.
+
+    Args:
+        starts (np.ndarray): Interval start times as int64 values
+        stops (np.ndarray): Interval stop times as int64 values, aligned with starts
+
+    Returns:
+        int: Maximum number of intervals open at the same time
+    """
+    if len(starts) == 0:
+        return 0
+
+    sorted_starts = np.sort(starts)
+    sorted_stops = np.sort(stops)
+
+    # The number of open intervals peaks at one of the start times
+    started = np.searchsorted(sorted_starts, sorted_starts, side='right')
+    stopped = np.searchsorted(sorted_stops, sorted_starts, side='right')
+    peak = int((started - stopped).max())
+
+    _, zero_length_open = _zero_length_counts(starts, stops, sorted_starts, sorted_stops)
+    if len(zero_length_open) > 0:
+        peak = max(peak, int(zero_length_open.max()))
+    return peak
+
+def max_concurrent_by_period(starts: np.ndarray, stops: np.ndarray, boundaries: np.ndarray) -> np.ndarray:
+    """
+    Calculate the maximum number of overlapping intervals within each period in a single sweep.
+
+    Intervals are half-open, so an interval starting at the same moment another one stops does not overlap it.
+    A period's peak is the same as sweeping every interval that starts before the period ends and stops no
+    earlier than it begins, so an interval stopping exactly at a period's first instant still counts toward it.
+
+    Args:
+        starts (np.ndarray): Interval start times as int64 values
+        stops (np.ndarray): Interval stop times as int64 values, aligned with starts
+        boundaries (np.ndarray): Sorted int64 period boundaries; period i covers [boundaries[i], boundaries[i + 1])
+
+    Returns:
+        np.ndarray: Maximum number of intervals open at the same time in each period
+    """
+    n_periods = len(boundaries) - 1
+    if len(starts) == 0:
+        return np.zeros(n_periods, dtype=np.int64)
+
+    sorted_starts = np.sort(starts)
+    sorted_stops = np.sort(stops)
+
+    # Intervals open when each period begins, or just before it for those stopping at the boundary
+    period_starts = boundaries[:-1]
+    peaks = np.maximum(
+        np.searchsorted(sorted_starts, period_starts, side='right') - np.searchsorted(sorted_stops, period_starts, side='right'),
+        np.searchsorted(sorted_starts, period_starts, side='left') - np.searchsorted(sorted_stops, period_starts, side='left')
+    )
+
+    # Within a period the count only rises at start times, so check each start against its period
+    open_at_start = (np.searchsorted(sorted_starts, sorted_starts, side='right')
+                     - np.searchsorted(sorted_stops, sorted_starts, side='right'))
+    period = np.searchsorted(boundaries, sorted_starts, side='right') - 1
+    inside = (period >= 0) & (period < n_periods)
+    np.maximum.at(peaks, period[inside], open_at_start[inside])
+
+    # Zero-length intervals are only open at their own instant
+    instants, zero_length_open = _zero_length_counts(starts, stops, sorted_starts, sorted_stops)
+    period = np.searchsorted(boundaries, instants, side='right') - 1
+    inside = (period >= 0) & (period < n_periods)
+    np.maximum.at(peaks, period[inside], zero_length_open[inside])
+
+    return peaks
+
+def calculate_concurrent_usage(df: pd.DataFrame, start_date: Optional[pd.Timestamp] = None,
                             end_date: Optional[pd.Timestamp] = None) -> int:
     """
     Calculate the maximum concurrent usage from a DataFrame.
@@ -22,30 +111,23 @@ def calculate_concurrent_usage(df: pd.DataFrame, start_date: Optional[pd.Timesta
     """
     max_concurrent = 0
     try:
-        timeline = []
-        for _, row in df.iterrows():
-            start = row['start_datetime']
-            stop = row['stop_datetime']
-            
-            # Clip to period boundaries if specified
-            if start_date is not None:
-                start = max(start, start_date)
-            if end_date is not None:
-                stop = min(stop, end_date)
-            
-            if pd.notna(start) and pd.notna(stop) and start <= stop:
-                timeline.append((start, 1))
-                timeline.append((stop, -1))
-        
-        if timeline:
-            timeline.sort(key=lambda x: x[0])
-            current_count = 0
-            for _, count_change in timeline:
-                current_count += count_change
-                max_concurrent = max(max_concurrent, current_count)
-    
+        starts = df['start_datetime']
+        stops = df['stop_datetime']
+
+        # Clip to period boundaries if specified
+        if start_date is not None:
+            starts = starts.clip(lower=start_date)
+        if end_date is not None:
+            stops = stops.clip(upper=end_date)
+
+        valid = starts.notna() & stops.notna() & (starts <= stops)
+        max_concurrent = max_concurrent_intervals(
+            starts[valid].to_numpy(dtype='datetime64[ns]').view(np.int64),
+            stops[valid].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        )
+
     except Exception as e:
         logger.error(f"Error calculating concurrent usage: {str(e)}")
         logger.debug("Error details:", exc_info=True)
-    
+
     return max_concurrent
@@ -5,12 +5,11 @@ import pandas as pd
 import logging
 from pathlib import Path
 from typing import Optional
-from tqdm import tqdm
 
 from ..utils import (
     VALID_EXTENSIONS,
     MODULE_COLUMNS,
-    classify_environment,
+    classify_environments,
     filter_time_range
 )
 
@@ -29,10 +28,7 @@ def load_and_preprocess_data(directory: Path, start_date: Optional[pd.Timestamp]
     Returns:
         pd.DataFrame: The combined and cleaned data.
     """
-    # Initialize tqdm for pandas
-    tqdm.pandas()
-    
-    files = [f for f in directory.glob('*') if f.suffix in VALID_EXTENSIONS]
+    files = [f for f in directory.glob('*') if f.suffix.lower() in VALID_EXTENSIONS]
     if not files:
         raise ValueError(f"No valid files found in {directory}")
     
@@ -43,7 +39,7 @@ def load_and_preprocess_data(directory: Path, start_date: Optional[pd.Timestamp]
         try:
             print(f"\rProcessing file {i}/{len(files)}: {file.name}" + " " * 50, end='')
             
-            if file.suffix == '.csv':
+            if file.suffix.lower() == '.csv':
                 df = pd.read_csv(file, low_memory=False)  # Added low_memory=False to prevent DtypeWarning
             else:
                 df = pd.read_excel(file)
@@ -145,10 +141,10 @@ def load_and_preprocess_data(directory: Path, start_date: Optional[pd.Timestamp]
     # Combine all dataframes
     combined_df = pd.concat(dfs, ignore_index=True)
     
-    # Add progress meter for environment classification
-    combined_df['Environment'] = combined_df.progress_apply(
-        lambda row: classify_environment(row['Hostname'], row['Source_Environment']),
-        axis=1
+    # Classify environments for all rows at once
+    combined_df['Environment'] = classify_environments(
+        combined_df['Hostname'],
+        combined_df['Source_Environment']
     )
     
     # Remove duplicates
@@ -170,6 +166,10 @@ def load_and_preprocess_data(directory: Path, start_date: Optional[pd.Timestamp]
             logger.debug(f"Final cleanup: Converting {invalid} invalid values in {col}")
             combined_df[col] = combined_df[col].map(lambda x: 1 if x == 1 else 0)
     
+    # Module flags are 0/1, so store them compactly; the metrics sum them with an explicit int64
+    # accumulator, since NumPy's default integer is 32-bit on Windows before NumPy 2
+    combined_df[MODULE_COLUMNS] = combined_df[MODULE_COLUMNS].astype('int8')
+    
     # Ensure stop_datetime is after start_datetime
     invalid_duration = combined_df['stop_datetime'] < combined_df['start_datetime']
     if invalid_duration.any():
@@ -2,82 +2,101 @@
 Metrics calculation functionality for the Deep Security Usage Analyzer.
 """
 import pandas as pd
+import numpy as np
 import logging
-from typing import Dict, Set
+from typing import Dict
 
 from ..utils import MODULE_COLUMNS
-from .concurrent_calculator import calculate_concurrent_usage
+from .concurrent_calculator import calculate_concurrent_usage, max_concurrent_by_period
 
 logger = logging.getLogger(__name__)
 
-def calculate_overall_metrics(data: pd.DataFrame) -> Dict:
-    """Calculate overall metrics from the data."""
-    # Add has_modules column to the dataframe
-    data['has_modules'] = data[MODULE_COLUMNS].sum(axis=1) > 0
+def _fast_corr(values: np.ndarray) -> np.ndarray:
+    """Calculate the Pearson correlation matrix of the columns of values, NaN for constant columns."""
+    n_cols = values.shape[1]
+    if len(values) < 2:
+        return np.full((n_cols, n_cols), np.nan)
     
-    # Calculate activated instances
-    activated_hosts = set(data[data['has_modules']]['Hostname'].unique())
-    total_hosts = set(data['Hostname'].unique())
+    # NumPy dispatches X.T @ X to a symmetric rank-k update that only computes one triangle
+    centered = values - values.mean(axis=0)
+    covariance = centered.T @ centered
+    std = np.sqrt(np.diag(covariance))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    constant = std == 0
+    correlation[constant, :] = np.nan
+    correlation[:, constant] = np.nan
+    
+    return np.clip(correlation, -1.0, 1.0)
+
+def _module_correlation(module_values: np.ndarray) -> Dict:
+    """Calculate the correlation between module columns as labels plus a nested list of values."""
+    return {
+        'labels': list(MODULE_COLUMNS),
+        'values': _fast_corr(module_values.astype(np.float64)).tolist()
+    }
+
+def calculate_overall_metrics(data: pd.DataFrame, module_values: np.ndarray) -> Dict:
+    """Calculate overall metrics from the data and its MODULE_COLUMNS values."""
+    # Calculate activated instances; every activated host is also counted in the total
+    activated_hosts = data.loc[data['has_modules'], 'Hostname'].nunique()
+    total_hosts = data['Hostname'].nunique()
     
     # Calculate overall metrics
     metrics = {
-        'total_instances': len(total_hosts),
-        'activated_instances': len(activated_hosts),
-        'inactive_instances': len(total_hosts - activated_hosts),
-        'total_hours': data['Duration (Seconds)'].sum() / 3600 if 'Duration (Seconds)' in data.columns else 0,
-        'activated_hours': data[data['has_modules']]['Duration (Seconds)'].sum() / 3600 if 'Duration (Seconds)' in data.columns else 0,
+        'total_instances': total_hosts,
+        'activated_instances': activated_hosts,
+        'inactive_instances': total_hosts - activated_hosts,
+        'total_hours': data['_hours'].sum(),
+        'activated_hours': data.loc[data['has_modules'], '_hours'].sum(),
     }
     metrics['inactive_hours'] = metrics['total_hours'] - metrics['activated_hours']
     
     # Calculate correlation matrix
-    correlation_matrix = data[MODULE_COLUMNS].corr()
-    metrics['correlation_matrix'] = correlation_matrix.to_dict()
+    metrics['correlation_matrix'] = _module_correlation(module_values)
     
     # Calculate module usage
-    metrics['module_usage'] = {
-        col: int(data[col].sum()) for col in MODULE_COLUMNS
-    }
+    metrics['module_usage'] = dict(zip(MODULE_COLUMNS, module_values.sum(axis=0, dtype=np.int64).tolist()))
     
     return metrics
 
-def calculate_environment_metrics(data: pd.DataFrame, env: str) -> Dict:
-    """Calculate metrics for a specific environment."""
-    env_data = data[data['Environment'] == env]
-    env_activated_hosts = set(env_data[env_data['has_modules']]['Hostname'].unique())
-    env_total_hosts = set(env_data['Hostname'].unique())
-    
-    # Calculate module usage for this environment
-    module_usage_counts = {
-        col: set(env_data[env_data[col] > 0]['Hostname']) for col in MODULE_COLUMNS
-    }
+def calculate_environment_metrics(env_data: pd.DataFrame, module_values: np.ndarray) -> Dict:
+    """Calculate metrics for the records of a single environment and their MODULE_COLUMNS values."""
+    env_activated_hosts = env_data.loc[env_data['has_modules'], 'Hostname'].nunique()
+    env_total_hosts = env_data['Hostname'].nunique()
+    
+    # Calculate module usage for this environment: reduce to one row per host, then count hosts per module
+    host_codes = env_data['Hostname'].cat.codes.to_numpy()
+    has_host = host_codes >= 0
+    per_host = pd.DataFrame(module_values[has_host] > 0, columns=MODULE_COLUMNS).groupby(
+        host_codes[has_host], sort=False
+    ).max()
+    module_usage_counts = per_host.to_numpy().sum(axis=0, dtype=np.int64)
     
     # Calculate module usage percentage
-    module_usage_percentage = {}
-    for module, instances in module_usage_counts.items():
-        unique_instance_count = len(instances)
-        percentage = (unique_instance_count / len(env_total_hosts)) * 100 if env_total_hosts else 0
-        module_usage_percentage[module] = percentage
+    module_usage_percentage = dict(zip(
+        MODULE_COLUMNS,
+        (module_usage_counts * (100.0 / max(env_total_hosts, 1))).tolist()
+    ))
     
     # Calculate max concurrent instances for environment
     max_concurrent = calculate_concurrent_usage(env_data)
     
     # Calculate total utilization hours
-    total_hours = (env_data['Duration (Seconds)'].sum() / 3600) if 'Duration (Seconds)' in env_data.columns else 0
+    total_hours = env_data['_hours'].sum()
     
     return {
-        'total_instances': len(env_total_hosts),
-        'activated_instances': len(env_activated_hosts),
-        'inactive_instances': len(env_total_hosts - env_activated_hosts),
-        'module_usage': {col: len(module_usage_counts[col]) for col in MODULE_COLUMNS},
+        'total_instances': env_total_hosts,
+        'activated_instances': env_activated_hosts,
+        'inactive_instances': env_total_hosts - env_activated_hosts,
+        'module_usage': dict(zip(MODULE_COLUMNS, module_usage_counts.tolist())),
         'module_usage_percentage': module_usage_percentage,
-        'most_common_module': max(
-            MODULE_COLUMNS,
-            key=lambda col: len(module_usage_counts[col])
-        ) if sum(len(instances) for instances in module_usage_counts.values()) > 0 else "None",
-        'avg_modules_per_host': env_data[MODULE_COLUMNS].sum(axis=1).mean(),
+        'most_common_module': MODULE_COLUMNS[int(np.argmax(module_usage_counts))] if module_usage_counts.sum() > 0 else "None",
+        'avg_modules_per_host': env_data['_module_sum'].mean(),
         'max_concurrent': max_concurrent,
         'total_utilization_hours': total_hours,
-        'correlation_matrix': env_data[MODULE_COLUMNS].corr().to_dict()
+        'correlation_matrix': _module_correlation(module_values)
     }
 
 def calculate_monthly_metrics(data: pd.DataFrame, start_date: pd.Timestamp = None, end_date: pd.Timestamp = None) -> Dict:
@@ -91,10 +110,6 @@ def calculate_monthly_metrics(data: pd.DataFrame, start_date: pd.Timestamp = Non
     }
     
     try:
-        # Get all activated instances
-        activated_mask = data[MODULE_COLUMNS].sum(axis=1) > 0
-        activated_instances = set(data[activated_mask]['Hostname'].unique())
-        
         # Get date range
         min_date = data['start_datetime'].min()
         max_date = data['start_datetime'].max()
@@ -102,73 +117,79 @@ def calculate_monthly_metrics(data: pd.DataFrame, start_date: pd.Timestamp = Non
         
         # Generate all months
         all_months = pd.date_range(
-            start=min_date.replace(day=1),
-            end=max_date.replace(day=1),
+            start=min_date.normalize().replace(day=1),
+            end=max_date.normalize().replace(day=1),
             freq='MS'
         )
         
+        # First and last month index (relative to the first month) each record overlaps
+        base_month = np.datetime64(all_months[0], 'M')
+        first_idx = (data['start_datetime'].to_numpy().astype('datetime64[M]') - base_month).astype(np.int64)
+        last_idx = (data['stop_datetime'].to_numpy().astype('datetime64[M]') - base_month).astype(np.int64)
+        last_idx = np.minimum(last_idx, len(all_months) - 1)
+        spans = np.clip(last_idx - first_idx + 1, 0, None)
+        
+        # Expand every record into one entry per month it spans
+        row_idx = np.repeat(np.arange(len(data)), spans)
+        month_idx = first_idx[row_idx] + np.arange(len(row_idx)) - np.repeat(np.cumsum(spans) - spans, spans)
+        months_with_data = np.unique(month_idx)
+        
+        # Keep only the entries of activated records
+        module_sum = data['_module_sum'].to_numpy()
+        host_codes = data['Hostname'].cat.codes.to_numpy()
+        activated_entries = data['has_modules'].to_numpy()[row_idx] & (host_codes[row_idx] >= 0)
+        activated_rows = row_idx[activated_entries]
+        long_df = pd.DataFrame({
+            'month': month_idx[activated_entries],
+            'host': host_codes[activated_rows],
+            'hours': data['_hours'].to_numpy()[activated_rows],
+            'module_sum': module_sum[activated_rows]
+        })
+        
+        # Aggregate all months in one pass
+        by_month = long_df.groupby('month')
+        summary = by_month.agg(
+            activated_instances=('host', 'nunique'),
+            total_hours=('hours', 'sum'),
+            avg_modules_per_host=('module_sum', 'mean')
+        ).reindex(months_with_data)
+        summary['activated_instances'] = summary['activated_instances'].fillna(0).astype(np.int64)
+        summary = summary.fillna(0.0)
+        
+        # New instances are first seen in a month; lost ones were seen before but not in it
+        first_seen = long_df.groupby('host')['month'].min()
+        new_instances = first_seen.value_counts().reindex(months_with_data, fill_value=0)
+        seen_before = new_instances.cumsum() - new_instances
+        lost_instances = seen_before - (summary['activated_instances'] - new_instances)
+        
+        # Calculate monthly growth
+        growth = summary['activated_instances'].diff().fillna(summary['activated_instances'])
+        positive_growth = growth[growth > 0]
+        if len(positive_growth) > 0:
+            monthly_metrics['average_monthly_growth'] = positive_growth.sum() / len(positive_growth)
+        
+        # Max concurrent activated instances within each month, from one sweep over all activated records
+        activated_records = data['has_modules'].to_numpy() & (host_codes >= 0)
+        month_boundaries = pd.date_range(all_months[0], periods=len(all_months) + 1, freq='MS')
+        monthly_max_concurrent = max_concurrent_by_period(
+            data['start_datetime'].to_numpy(dtype='datetime64[ns]').view(np.int64)[activated_records],
+            data['stop_datetime'].to_numpy(dtype='datetime64[ns]').view(np.int64)[activated_records],
+            month_boundaries.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        )
+        
         monthly_data = []
-        cumulative_instances = set()
-        previous_month_count = 0
-        total_growth = 0
-        growth_months = 0
-        
-        for month_start in all_months:
-            month_end = month_start + pd.offsets.MonthEnd(1)
-            
-            # Get all records for this month
-            month_mask = (
-                (data['start_datetime'] <= month_end) & 
-                (data['stop_datetime'] >= month_start)
-            )
-            month_data = data[month_mask].copy()
-            
-            if not month_data.empty:
-                # Get activated instances for this month
-                activated_month_data = month_data[month_data[MODULE_COLUMNS].sum(axis=1) > 0]
-                activated_instances_current = set(activated_month_data['Hostname'].unique())
-
-                # Calculate duration per instance without double counting
-                duration_per_instance = activated_month_data.groupby('Hostname')['Duration (Seconds)'].sum()
-                total_hours = duration_per_instance.sum() / 3600
-
-                # Calculate average modules per host
-                avg_modules_per_host = activated_month_data[MODULE_COLUMNS].sum(axis=1).mean() if not activated_month_data.empty else 0.0
-
-                # Max concurrent instances in the month
-                max_concurrent = calculate_concurrent_usage(activated_month_data)
-
-                # Calculate new and lost instances
-                new_instances = activated_instances_current - cumulative_instances
-                lost_instances = cumulative_instances - activated_instances_current
-
-                # Update cumulative instances
-                cumulative_instances.update(activated_instances_current)
-
-                # Calculate monthly growth
-                current_month_count = len(activated_instances_current)
-                growth = current_month_count - previous_month_count
-                if growth > 0:
-                    total_growth += growth
-                    growth_months += 1
-                previous_month_count = current_month_count
-
-                # Append metrics for the month
-                monthly_data.append({
-                    'month': month_start.strftime('%Y-%m'),
-                    'activated_instances': current_month_count,
-                    'new_instances': len(new_instances),
-                    'lost_instances': len(lost_instances),
-                    'max_concurrent': max_concurrent,
-                    'avg_modules_per_host': avg_modules_per_host,
-                    'total_hours': total_hours,
-                })
-        
-        # Calculate average monthly growth
-        if growth_months > 0:
-            monthly_metrics['average_monthly_growth'] = total_growth / growth_months
-        
-        monthly_metrics['data'] = sorted(monthly_data, key=lambda x: x['month'])
+        for month in months_with_data:
+            monthly_data.append({
+                'month': all_months[month].strftime('%Y-%m'),
+                'activated_instances': int(summary.at[month, 'activated_instances']),
+                'new_instances': int(new_instances[month]),
+                'lost_instances': int(lost_instances[month]),
+                'max_concurrent': int(monthly_max_concurrent[month]),
+                'avg_modules_per_host': float(summary.at[month, 'avg_modules_per_host']),
+                'total_hours': float(summary.at[month, 'total_hours']),
+            })
+        
+        monthly_metrics['data'] = monthly_data
         monthly_metrics['total_months'] = len(monthly_data)
         
         return monthly_metrics
@@ -184,8 +205,22 @@ def calculate_all_metrics(data: pd.DataFrame) -> Dict:
     
     logger.info("Calculating comprehensive metrics...")
     
-    # Add has_modules column to the dataframe
-    data['has_modules'] = data[MODULE_COLUMNS].sum(axis=1) > 0
+    # Store hostnames and environments as categories so grouping and unique counts work on integer codes
+    data['Hostname'] = data['Hostname'].astype('category')
+    data['Environment'] = data['Environment'].astype('category')
+    
+    # Extract the module flags once as a 2-D array shared by all metric calculations
+    module_values = data[MODULE_COLUMNS].to_numpy()
+    
+    # Add module count and has_modules columns once for all metric calculations
+    data['_module_sum'] = module_values.sum(axis=1, dtype=np.int64)
+    data['has_modules'] = data['_module_sum'] > 0
+    
+    # Convert durations to hours once; data without a duration column counts as zero hours
+    if 'Duration (Seconds)' in data.columns:
+        data['_hours'] = data['Duration (Seconds)'] / 3600
+    else:
+        data['_hours'] = 0.0
     
     # Initialize metrics dictionary
     metrics = {
@@ -196,12 +231,14 @@ def calculate_all_metrics(data: pd.DataFrame) -> Dict:
     }
     
     # Calculate overall metrics
-    metrics['overall'] = calculate_overall_metrics(data)
+    metrics['overall'] = calculate_overall_metrics(data, module_values)
     
-    # Calculate environment metrics
-    environments = sorted(data['Environment'].unique())
-    for env in environments:
-        metrics['by_environment'][env] = calculate_environment_metrics(data, env)
+    # Calculate environment metrics, splitting the data by environment in one pass
+    env_groups = data.groupby('Environment', observed=True, sort=True)
+    for env, env_data in env_groups:
+        metrics['by_environment'][env] = calculate_environment_metrics(
+            env_data, module_values[env_groups.indices[env]]
+        )
     
     # Calculate environment distribution
     metrics['overall']['environment_distribution'] = {
@@ -216,9 +253,9 @@ def calculate_all_metrics(data: pd.DataFrame) -> Dict:
     
     metrics['overall_metrics'] = {
         'max_concurrent_overall': overall_max_concurrent,
-        'total_unique_instances': len(set(data['Hostname'].unique())),
-        'total_activated_instances': len(set(data[data['has_modules']]['Hostname'].unique())),
-        'total_inactive_instances': len(set(data['Hostname'].unique()) - set(data[data['has_modules']]['Hostname'].unique()))
+        'total_unique_instances': metrics['overall']['total_instances'],
+        'total_activated_instances': metrics['overall']['activated_instances'],
+        'total_inactive_instances': metrics['overall']['inactive_instances']
     }
     
     # Calculate monthly metrics
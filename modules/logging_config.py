@@ -2,7 +2,10 @@
 Custom logging configuration for the Deep Security Usage Analyzer.
 """
 import logging
+import logging.handlers
+import queue
 import sys
+from typing import Tuple
 
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors and symbols"""
@@ -21,21 +24,34 @@ class ColoredFormatter(logging.Formatter):
         logging.CRITICAL: (bold_red, "🚨")
     }
 
+    def __init__(self):
+        super().__init__()
+        self._inner = logging.Formatter(self.format_str)
+
     def format(self, record):
         color, symbol = self.FORMATS.get(record.levelno, (self.reset, "•"))
-        record.symbol = f"{symbol}"
-        record.msg = f"{color}{record.msg}{self.reset}"
-        return logging.Formatter(self.format_str).format(record)
+        # Format a copy so other handlers still see the original, uncolored record
+        colored = logging.makeLogRecord({
+            **record.__dict__,
+            'symbol': symbol,
+            'msg': f"{color}{record.getMessage()}{self.reset}",
+            'args': None
+        })
+        return self._inner.format(colored)
 
-def setup_logging(log_file: str = 'security_analysis.log') -> logging.Logger:
+def setup_logging(log_file: str = 'security_analysis.log') -> Tuple[logging.Logger, logging.handlers.QueueListener]:
     """
     Set up logging configuration with both console and file handlers.
+
+    Records are placed on an in-memory queue and written by a background
+    listener thread, so logging calls never block on console or disk I/O.
     
     Args:
         log_file (str): Name of the log file. Defaults to 'security_analysis.log'.
         
     Returns:
-        logging.Logger: Configured logger instance.
+        Tuple[logging.Logger, logging.handlers.QueueListener]: Configured logger instance
+            and the running listener, which should be stopped on shutdown.
     """
     # Create console handler with custom formatter
     console_handler = logging.StreamHandler(sys.stdout)
@@ -49,10 +65,42 @@ def setup_logging(log_file: str = 'security_analysis.log') -> logging.Logger:
     ))
     file_handler.setLevel(logging.DEBUG)  # Log everything to file
 
+    # Batch file writes, flushing immediately on errors
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
+    buffered_file_handler.setLevel(logging.DEBUG)
+
+    # Hand records off to a background thread for console and file output
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        console_handler,
+        buffered_file_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+
     # Set up logger
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.DEBUG)
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    return logger, listener
 
-    return logger
+def shutdown_logging(listener: logging.handlers.QueueListener) -> None:
+    """
+    Stop the logging listener and flush any buffered records to disk.
+
+    Args:
+        listener (logging.handlers.QueueListener): Listener returned by setup_logging.
+    """
+    listener.stop()
+    for handler in listener.handlers:
+        # Closing a MemoryHandler flushes it into its target but leaves the target open
+        target = handler.target if isinstance(handler, logging.handlers.MemoryHandler) else None
+        handler.close()
+        if target is not None:
+            target.close()
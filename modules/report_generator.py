@@ -2,11 +2,11 @@
 Report generation functionality for the Deep Security Usage Analyzer.
 """
 from pathlib import Path
-from typing import Dict
-import matplotlib.pyplot as plt
+from typing import Collection, Dict, Optional
 from .reporting import generate_report
 
-def generate_reports(metrics: Dict, output_dir: Path, visualizations: Dict[str, plt.Figure]) -> None:
+def generate_reports(metrics: Dict, output_dir: Path, visualizations: Dict[str, bytes],
+                     formats: Optional[Collection[str]] = None) -> None:
     """
     Generate comprehensive HTML and PDF reports of the analysis.
     This is a wrapper around the reporting package's generate_report function.
@@ -14,6 +14,7 @@ def generate_reports(metrics: Dict, output_dir: Path, visualizations: Dict[str,
     Args:
         metrics (Dict): Dictionary containing all metrics data
         output_dir (Path): Directory to save the reports
-        visualizations (Dict[str, plt.Figure]): Dictionary of visualization figures
+        visualizations (Dict[str, bytes]): Dictionary of rendered PNG data of the visualizations
+        formats (Optional[Collection[str]]): Report formats to generate ('html', 'pdf'); all when None
     """
-    generate_report(metrics, output_dir, visualizations)
+    generate_report(metrics, output_dir, visualizations, formats)
@@ -1,32 +1,47 @@
 """
 Report generation package for Deep Security Usage Analyzer.
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
-import matplotlib.pyplot as plt
+from typing import Collection, Dict, Optional
 from .html_generator import generate_html_report
 from .pdf_generator import generate_pdf_report
 from .image_handler import embed_images_in_html
 
-def generate_report(metrics: Dict, output_dir: Path, visualizations: Dict[str, plt.Figure]) -> None:
+# Report formats that can be generated
+REPORT_FORMATS = frozenset({'html', 'pdf'})
+
+def generate_report(metrics: Dict, output_dir: Path, visualizations: Dict[str, bytes],
+                    formats: Optional[Collection[str]] = None) -> None:
     """
     Generate comprehensive HTML and PDF reports of the analysis.
 
     Args:
         metrics (Dict): Dictionary containing all metrics data
         output_dir (Path): Directory to save the reports
-        visualizations (Dict[str, plt.Figure]): Dictionary of visualization figures
+        visualizations (Dict[str, bytes]): Dictionary of rendered PNG data of the visualizations
+        formats (Optional[Collection[str]]): Report formats to generate ('html', 'pdf'); all when None
     """
-    # Generate HTML report
-    report_html = generate_html_report(metrics)
-    
-    # Embed images in HTML
-    report_html = embed_images_in_html(report_html, output_dir, visualizations)
-    
-    # Save HTML report
-    report_path = output_dir / 'report.html'
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report_html)
-    
-    # Generate PDF report
-    generate_pdf_report(metrics, output_dir, visualizations)
+    formats = REPORT_FORMATS if formats is None else frozenset(formats)
+    if not formats <= REPORT_FORMATS:
+        raise ValueError(f"Unsupported report formats: {', '.join(sorted(formats - REPORT_FORMATS))}")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Generate PDF report in the background; it only reads the metrics and rendered images
+        pdf_future = executor.submit(generate_pdf_report, metrics, output_dir, visualizations) if 'pdf' in formats else None
+        
+        if 'html' in formats:
+            # Generate HTML report, encoding it once so the images are embedded as bytes
+            report_html = generate_html_report(metrics).encode('utf-8')
+            
+            # Embed images in HTML
+            report_html = embed_images_in_html(report_html, visualizations)
+            
+            # Save HTML report in a single binary write
+            report_path = output_dir / 'report.html'
+            with open(report_path, 'wb') as f:
+                f.write(report_html)
+        
+        # Wait for the PDF report, re-raising any error from it
+        if pdf_future is not None:
+            pdf_future.result()
@@ -1,9 +1,15 @@
 """
 HTML report generation functionality for Deep Security Usage Analyzer.
 """
-from typing import Dict
+import html
+import logging
+import re
+from itertools import islice
+from typing import Dict, Optional
 from datetime import datetime
-from jinja2 import Template
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+
+logger = logging.getLogger(__name__)
 
 # HTML report template
 REPORT_TEMPLATE = """
@@ -108,19 +114,19 @@ REPORT_TEMPLATE = """
         <h2>Overall Metrics</h2>
         <div class="grid">
             <div class="metric-card">
-                <div class="metric-value">{{ metrics.overall.total_instances | default(0) }}</div>
+                <div class="metric-value">{{ view.total_instances }}</div>
                 <div class="metric-label">Total Unique Instances</div>
             </div>
             <div class="metric-card">
-                <div class="metric-value">{{ metrics.overall.activated_instances | default(0) }}</div>
+                <div class="metric-value">{{ view.activated_instances }}</div>
                 <div class="metric-label">Activated Instances</div>
             </div>
             <div class="metric-card">
-                <div class="metric-value">{{ metrics.overall.inactive_instances | default(0) }}</div>
+                <div class="metric-value">{{ view.inactive_instances }}</div>
                 <div class="metric-label">Inactive Instances</div>
             </div>
             <div class="metric-card">
-                <div class="metric-value">{{ "{:,.1f}".format(metrics.overall.total_hours | default(0.0) | round(1)) }}</div>
+                <div class="metric-value">{{ view.total_hours }}</div>
                 <div class="metric-label">Total Hours</div>
             </div>
         </div>
@@ -137,22 +143,7 @@ REPORT_TEMPLATE = """
                 <th>Max Concurrent</th>
                 <th>Total Hours</th>
             </tr>
-            {% for env, data in metrics.by_environment.items() %}
-            <tr>
-                <td>{{ env }}</td>
-                <td>{{ data.total_instances }}</td>
-                <td>{{ data.activated_instances }}</td>
-                <td>{{ data.most_common_module }}</td>
-                <td>{{ data.max_concurrent if data.max_concurrent else 'None' }}</td>
-                <td>
-                    {% if data.total_utilization_hours is defined and data.total_utilization_hours != 'N/A' %}
-                        {{ "{:,.1f}".format(data.total_utilization_hours) }}
-                    {% else %}
-                        N/A
-                    {% endif %}
-                </td>
-            </tr>
-            {% endfor %}
+            {{ environment_rows }}
         </table>
     </div>
     
@@ -181,35 +172,35 @@ REPORT_TEMPLATE = """
             </tr>
             <tr>
                 <td>Total Unique Instances</td>
-                <td>{{ "{:,}".format(metrics.overall.total_instances) }}</td>
+                <td>{{ view.total_instances_fmt }}</td>
             </tr>
             <tr>
                 <td>Instances Running at Least One Module</td>
-                <td>{{ "{:,}".format(metrics.overall.activated_instances) }}</td>
+                <td>{{ view.activated_instances_fmt }}</td>
             </tr>
             <tr>
                 <td>Instances Not Running Any Modules</td>
-                <td>{{ "{:,}".format(metrics.overall.inactive_instances) }}</td>
+                <td>{{ view.inactive_instances_fmt }}</td>
             </tr>
             <tr>
                 <td>Total Hours</td>
-                <td>{{ "{:,.1f}".format(metrics.overall.total_hours) }}</td>
+                <td>{{ view.total_hours }}</td>
             </tr>
             <tr>
                 <td>Hours for Instances with Modules</td>
-                <td>{{ "{:,.1f}".format(metrics.overall.activated_hours) }}</td>
+                <td>{{ view.activated_hours }}</td>
             </tr>
             <tr>
                 <td>Hours for Instances without Modules</td>
-                <td>{{ "{:,.1f}".format(metrics.overall.inactive_hours) }}</td>
+                <td>{{ view.inactive_hours }}</td>
             </tr>
             <tr>
                 <td>Average Monthly Growth (Activated Instances)</td>
-                <td>{{ "%.1f"|format(metrics.monthly.average_monthly_growth) }} instances</td>
+                <td>{{ view.average_monthly_growth }} instances</td>
             </tr>
             <tr>
                 <td>Unknown Environment Instances</td>
-                <td>{{ "{:,}".format(metrics.by_environment.Unknown.total_instances if metrics.by_environment.Unknown else 0) }}</td>
+                <td>{{ view.unknown_instances }}</td>
             </tr>
         </table>
     </div>
@@ -218,11 +209,11 @@ REPORT_TEMPLATE = """
         <h2>Monthly Data Analysis</h2>
         <div class="grid">
             <div class="metric-card">
-                <div class="metric-value">{{ metrics.monthly.total_months }}</div>
+                <div class="metric-value">{{ view.total_months }}</div>
                 <div class="metric-label">Total Months with Data</div>
             </div>
             <div class="metric-card">
-                <div class="metric-value">{{ metrics.monthly.date_range }}</div>
+                <div class="metric-value">{{ view.date_range }}</div>
                 <div class="metric-label">Date Range</div>
             </div>
         </div>
@@ -234,33 +225,18 @@ REPORT_TEMPLATE = """
                 <th>Max Concurrent Instances</th>
                 <th>Avg Modules/Host</th>
             </tr>
-            {% if metrics.monthly and metrics.monthly.data %}
-                {% for month in metrics.monthly.data %}
-                <tr>
-                    <td>{{ month.month | default('None') }}</td>
-                    <td>
-                        {{ month.activated_instances | default(0) }}
-                    </td>
-                    <td>{{ month.max_concurrent | default(0) }}</td>
-                    <td>{{ "%.2f"|format(month.avg_modules_per_host | default(0.0)) }}</td>
-                </tr>
-                {% endfor %}
-            {% else %}
-                <tr>
-                    <td colspan="5">No monthly data available</td>
-                </tr>
-            {% endif %}
+            {{ monthly_rows }}
         </table>
     </div>
 
-    {% if metrics.by_environment.Unknown and metrics.by_environment.Unknown.total_instances > 0 %}
+    {% if view.has_unknown %}
     <div class="section highlight">
         <h2>Unknown Environment Analysis</h2>
-        <p>Number of hosts in unknown environment: {{ "{:,}".format(metrics.by_environment.Unknown.total_instances) }}</p>
+        <p>Number of hosts in unknown environment: {{ view.unknown_instances }}</p>
         <p>Common patterns found in unknown hosts:</p>
         <ul>
         {% for pattern in unknown_patterns %}
-            <li>{{ pattern }}</li>
+            <li>{{ pattern | e }}</li>
         {% endfor %}
         </ul>
     </div>
@@ -270,6 +246,98 @@ REPORT_TEMPLATE = """
 </html>
 """
 
+# Table row templates, filled with str.format_map rather than Jinja loops
+ENVIRONMENT_ROW_TEMPLATE = (
+    "<tr><td>{environment}</td><td>{total_instances}</td><td>{activated_instances}</td>"
+    "<td>{most_common_module}</td><td>{max_concurrent}</td><td>{total_hours}</td></tr>"
+)
+MONTHLY_ROW_TEMPLATE = (
+    "<tr><td>{month}</td><td>{activated_instances}</td><td>{max_concurrent}</td>"
+    "<td>{avg_modules_per_host:.2f}</td></tr>"
+)
+NO_MONTHLY_DATA_ROW = '<tr><td colspan="5">No monthly data available</td></tr>'
+
+def _create_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Create the on-disk template bytecode cache, or None when there is no usable temp directory."""
+    try:
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError) as e:
+        logger.debug("Template bytecode cache unavailable, compiling without it: %s", e)
+        return None
+
+# Shared Jinja environment; templates are built from module constants, so never check for reloads.
+# Block tags are stripped together with their indentation and newline to keep the output compact.
+# Autoescaping stays off since the values are pre-formatted; free-text strings are escaped where they are inserted.
+# Source indentation is dropped from the template once here, rather than from every rendered report.
+# Compiled template code is cached on disk (in the user's temp directory) so later runs skip compilation.
+_JINJA_ENV = Environment(
+    loader=DictLoader({'report.html': re.sub(r'\n\s+', '\n', REPORT_TEMPLATE)}),
+    bytecode_cache=_create_bytecode_cache(),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    autoescape=False,
+    auto_reload=False
+)
+
+# Compile the report template once at import instead of on every render. The bytecode cache is
+# only an optimization, so if it cannot be read or written the template is compiled without it.
+try:
+    _REPORT_TEMPLATE = _JINJA_ENV.get_template('report.html')
+except OSError as e:
+    logger.debug("Template bytecode cache unavailable, compiling without it: %s", e)
+    _JINJA_ENV.bytecode_cache = None
+    _REPORT_TEMPLATE = _JINJA_ENV.get_template('report.html')
+
+def _render_environment_rows(by_environment: Dict) -> str:
+    """Render the Environment Distribution table rows."""
+    return ''.join(
+        ENVIRONMENT_ROW_TEMPLATE.format_map({
+            'environment': html.escape(str(env)),
+            'total_instances': data['total_instances'],
+            'activated_instances': data['activated_instances'],
+            'most_common_module': html.escape(str(data['most_common_module'])),
+            'max_concurrent': data['max_concurrent'] if data['max_concurrent'] else 'None',
+            'total_hours': "{:,.1f}".format(data['total_utilization_hours'])
+                if isinstance(data.get('total_utilization_hours'), (int, float)) else 'N/A'
+        })
+        for env, data in by_environment.items()
+    )
+
+def _render_monthly_rows(monthly_data: list) -> str:
+    """Render the Monthly Data Analysis table rows."""
+    if not monthly_data:
+        return NO_MONTHLY_DATA_ROW
+    return ''.join(
+        MONTHLY_ROW_TEMPLATE.format_map({
+            'month': month.get('month', 'None'),
+            'activated_instances': month.get('activated_instances', 0),
+            'max_concurrent': month.get('max_concurrent', 0),
+            'avg_modules_per_host': month.get('avg_modules_per_host', 0.0)
+        })
+        for month in monthly_data
+    )
+
+def _build_view(overall: Dict, monthly: Dict, unknown: Dict) -> Dict:
+    """Format the scalar values shown in the report once, ahead of rendering."""
+    unknown_instances = unknown.get('total_instances', 0)
+    
+    return {
+        'total_instances': overall.get('total_instances', 0),
+        'activated_instances': overall.get('activated_instances', 0),
+        'inactive_instances': overall.get('inactive_instances', 0),
+        'total_instances_fmt': "{:,}".format(overall.get('total_instances', 0)),
+        'activated_instances_fmt': "{:,}".format(overall.get('activated_instances', 0)),
+        'inactive_instances_fmt': "{:,}".format(overall.get('inactive_instances', 0)),
+        'total_hours': "{:,.1f}".format(overall.get('total_hours', 0.0)),
+        'activated_hours': "{:,.1f}".format(overall.get('activated_hours', 0.0)),
+        'inactive_hours': "{:,.1f}".format(overall.get('inactive_hours', 0.0)),
+        'average_monthly_growth': "%.1f" % monthly.get('average_monthly_growth', 0),
+        'total_months': monthly.get('total_months', 0),
+        'date_range': monthly.get('date_range', ''),
+        'unknown_instances': "{:,}".format(unknown_instances),
+        'has_unknown': unknown_instances > 0
+    }
+
 def generate_html_report(metrics: Dict) -> str:
     """
     Generate HTML report from metrics data.
@@ -280,17 +348,19 @@ def generate_html_report(metrics: Dict) -> str:
     Returns:
         str: Generated HTML report content
     """
+    # Look up each section of the metrics once
+    by_environment = metrics.get('by_environment') or {}
+    monthly = metrics.get('monthly') or {}
+    unknown = by_environment.get('Unknown') or {}
+    
     # Create report context
     report_context = {
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'metrics': metrics,
-        'unknown_patterns': []
+        'view': _build_view(metrics.get('overall') or {}, monthly, unknown),
+        'unknown_patterns': list(islice(unknown.get('patterns', ()), 10)),
+        'environment_rows': _render_environment_rows(by_environment),
+        'monthly_rows': _render_monthly_rows(monthly.get('data', []))
     }
     
-    # Add unknown patterns if they exist
-    if 'Unknown' in metrics.get('by_environment', {}):
-        report_context['unknown_patterns'] = metrics['by_environment']['Unknown'].get('patterns', [])[:10]
-    
     # Render template
-    template = Template(REPORT_TEMPLATE)
-    return template.render(**report_context)
+    return _REPORT_TEMPLATE.render(**report_context)
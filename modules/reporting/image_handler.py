@@ -1,55 +1,85 @@
 """
 Image handling functionality for Deep Security Usage Analyzer reports.
 """
-import base64
+import io
+import os
 import re
 import logging
-from pathlib import Path
-from typing import Dict
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Union
+from PIL import Image
+
+try:
+    import pybase64 as base64
+except ImportError:  # pybase64 is optional; fall back to the standard library encoder
+    import base64
 
 logger = logging.getLogger(__name__)
 
-def embed_images_in_html(html_content: str, output_dir: Path, visualizations: Dict[str, plt.Figure]) -> str:
+# Matches the <img> tags that reference a chart PNG by file name
+_IMG_TAG_PATTERN = re.compile(
+    rb'<img\s+src=["\']([\w.-]+)\.png["\']\s+alt=["\'][^"\']*["\']\s*/?>',
+    re.IGNORECASE
+)
+
+def _encode_for_embedding(name: str, png_data: bytes) -> Tuple[str, Union[bytes, memoryview]]:
+    """
+    Re-encode a chart PNG as a 256-color palette WebP for embedding, falling back to the original PNG bytes.
+
+    The charts are flat-colored, so reducing them to a palette only shifts the colors of
+    antialiased edges slightly and roughly halves the encoded size.
+
+    Args:
+        name (str): Name of the visualization
+        png_data (bytes): Rendered PNG data
+
+    Returns:
+        Tuple[str, Union[bytes, memoryview]]: MIME type and image data; a view of the
+            encoder's buffer rather than a copy of it
+    """
+    try:
+        with Image.open(io.BytesIO(png_data)) as img:
+            buffer = io.BytesIO()
+            img.quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, format='WEBP', lossless=True, method=2)
+        return 'image/webp', buffer.getbuffer()
+    except (OSError, ValueError, KeyError) as e:
+        # Pillow raises OSError for undecodable data, KeyError when built without WebP
+        # support and ValueError when the image cannot be quantized
+        logger.debug("WebP encoding failed for %s, embedding PNG: %s", name, e)
+        return 'image/png', png_data
+
+def embed_images_in_html(html_content: bytes, visualizations: Dict[str, bytes]) -> bytes:
     """
-    Embed existing PNG files from the output directory into the HTML content as base64 strings.
+    Embed the rendered visualization images into the encoded HTML content as base64 strings.
+
+    Charts are embedded as 256-color palette WebP, which is a fraction of the PNG size, or as PNG
+    when WebP encoding is unavailable. The HTML is handled as UTF-8 bytes so the base64
+    data is never decoded to text.
 
     Args:
-        html_content (str): The HTML content to embed images into
-        output_dir (Path): Directory containing the PNG files
-        visualizations (Dict[str, plt.Figure]): Dictionary of visualization names
+        html_content (bytes): The UTF-8 encoded HTML content to embed images into
+        visualizations (Dict[str, bytes]): Dictionary of rendered PNG data of the visualizations
 
     Returns:
-        str: The HTML content with embedded images
+        bytes: The UTF-8 encoded HTML content with embedded images
     """
-    for name in visualizations.keys():
-        try:
-            # Get the path to the existing PNG file
-            png_path = output_dir / f'{name}.png'
-            
-            if png_path.exists():
-                # Read the existing PNG file
-                with open(png_path, 'rb') as img_file:
-                    img_data = img_file.read()
-                
-                # Encode the image as base64
-                img_str = base64.b64encode(img_data).decode('utf-8')
-                img_tag = f'data:image/png;base64,{img_str}'
-                
-                logger.debug(f"Embedding existing PNG for {name}")
-
-                # Replace image source with embedded base64 string
-                html_content = re.sub(
-                    rf'<img\s+src=["\']{re.escape(name)}\.png["\']\s+alt=["\'].*?["\']\s*/?>',
-                    f'<img src="{img_tag}" alt="{name.replace("_", " ").title()}">',
-                    html_content,
-                    flags=re.IGNORECASE
-                )
-            else:
-                logger.warning(f"PNG file not found for {name}: {png_path}")
-                
-        except Exception as e:
-            logger.error(f"Error embedding image {name}: {str(e)}")
-            continue
-
-    return html_content
+    # Skip the conversion for images the report does not reference
+    referenced = [name for name in visualizations if b'%s.png' % name.encode('utf-8') in html_content]
+    
+    # Convert the rendered PNGs to their embedded format concurrently; Pillow decodes and
+    # encodes in C and releases the GIL while doing so
+    with ThreadPoolExecutor(max_workers=max(1, min(len(referenced), os.cpu_count() or 1))) as executor:
+        encoded = executor.map(_encode_for_embedding, referenced, [visualizations[name] for name in referenced])
+        
+        img_tags = {}
+        for name, (mime_type, img_data) in zip(referenced, encoded):
+            # Encode the image as base64
+            logger.debug("Embedding rendered image for %s", name)
+            img_tags[name.encode('utf-8')] = b'<img src="data:%s;base64,%s" alt="%s">' % (
+                mime_type.encode('ascii'),
+                base64.b64encode(img_data),
+                name.replace('_', ' ').title().encode('utf-8')
+            )
+
+    # Replace every image source with its embedded base64 string in a single pass
+    return _IMG_TAG_PATTERN.sub(lambda match: img_tags.get(match.group(1), match.group(0)), html_content)
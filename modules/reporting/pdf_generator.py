@@ -1,28 +1,52 @@
 """
 PDF report generation functionality for Deep Security Usage Analyzer.
 """
+import io
 from typing import Dict
 from pathlib import Path
 import logging
-import matplotlib.pyplot as plt
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import inch
 
 logger = logging.getLogger(__name__)
 
-def generate_pdf_report(metrics: Dict, output_dir: Path, visualizations: Dict[str, plt.Figure]) -> None:
+# Style shared by every table in the report; Table.setStyle only reads its commands
+_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0,0), (-1,0), colors.grey),
+    ('TEXTCOLOR',(0,0),(-1,0),colors.whitesmoke),
+    ('ALIGN',(0,0),(-1,-1),'LEFT'),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0,0), (-1,0), 12),
+    ('BACKGROUND',(0,1),(-1,-1),colors.beige),
+    ('GRID', (0,0), (-1,-1), 1, colors.black),
+])
+
+# Visualizations in report order: name, width and height in inches, and optional heading
+_VISUALIZATION_LAYOUT = (
+    ('module_usage', 6, 4, None),
+    ('environment_distribution', 6, 6, None),
+    ('activated_instances_growth', 6, 4, "Growth of Activated Instances Over Time"),
+)
+
+def generate_pdf_report(metrics: Dict, output_dir: Path, visualizations: Dict[str, bytes]) -> None:
     """
     Create a PDF report using ReportLab.
 
     Args:
         metrics (Dict): Dictionary containing all metrics data
-        output_dir (Path): Directory containing visualization images
-        visualizations (Dict[str, plt.Figure]): Dictionary of visualization figures
+        output_dir (Path): Directory to save the PDF report
+        visualizations (Dict[str, bytes]): Dictionary of rendered PNG data of the visualizations
     """
     try:
+        # Look up each section of the metrics once
+        overall = metrics['overall']
+        by_environment = metrics['by_environment']
+        monthly = metrics['monthly']
+        unknown = by_environment.get('Unknown')
+
         pdf_path = output_dir / 'report.pdf'
         doc = SimpleDocTemplate(str(pdf_path), pagesize=letter,
                               rightMargin=72, leftMargin=72,
@@ -38,12 +62,12 @@ def generate_pdf_report(metrics: Dict, output_dir: Path, visualizations: Dict[st
         # Overall Metrics
         story.append(Paragraph("Overall Metrics", styles['Heading2']))
         overall_data = [
-            ["Total Unique Instances", f"{metrics['overall']['total_instances']:,}"],
-            ["Activated Instances", f"{metrics['overall']['activated_instances']:,}"],
-            ["Inactive Instances", f"{metrics['overall']['inactive_instances']:,}"],
-            ["Total Hours", f"{metrics['overall']['total_hours']:.1f}"],
-            ["Activated Hours", f"{metrics['overall']['activated_hours']:.1f}"],
-            ["Inactive Hours", f"{metrics['overall']['inactive_hours']:.1f}"]
+            ["Total Unique Instances", f"{overall['total_instances']:,}"],
+            ["Activated Instances", f"{overall['activated_instances']:,}"],
+            ["Inactive Instances", f"{overall['inactive_instances']:,}"],
+            ["Total Hours", f"{overall['total_hours']:.1f}"],
+            ["Activated Hours", f"{overall['activated_hours']:.1f}"],
+            ["Inactive Hours", f"{overall['inactive_hours']:.1f}"]
         ]
         table = _create_table(overall_data)
         story.append(table)
@@ -51,36 +75,37 @@ def generate_pdf_report(metrics: Dict, output_dir: Path, visualizations: Dict[st
 
         # Environment Distribution
         story.append(Paragraph("Environment Distribution", styles['Heading2']))
-        env_data = [["Environment", "Total Hosts", "Activated Hosts", "Most Used Module", "Max Concurrent", "Total Hours"]]
-        for env, data in metrics['by_environment'].items():
-            env_data.append([
+        env_data = [["Environment", "Total Hosts", "Activated Hosts", "Most Used Module", "Max Concurrent", "Total Hours"]] + [
+            [
                 env,
                 f"{data['total_instances']}",
                 f"{data['activated_instances']}",
                 data['most_common_module'],
                 f"{data['max_concurrent'] if data['max_concurrent'] else 'None'}",
                 f"{data['total_utilization_hours']:.1f}" if isinstance(data['total_utilization_hours'], (int, float)) else "None"
-            ])
+            ]
+            for env, data in by_environment.items()
+        ]
         table = _create_table(env_data)
         story.append(table)
         story.append(Spacer(1, 24))
 
         # Module Usage Analysis
         story.append(Paragraph("Module Usage Analysis", styles['Heading2']))
-        _add_visualizations(story, output_dir, visualizations)
+        _add_visualizations(story, visualizations, styles)
 
         # Statistics Summary
         story.append(Paragraph("Statistics Summary", styles['Heading2']))
         stats_data = [
             ["Metric", "Value"],
-            ["Total Unique Instances", f"{metrics['overall']['total_instances']:,}"],
-            ["Instances Running at Least One Module", f"{metrics['overall']['activated_instances']:,}"],
-            ["Instances Not Running Any Modules", f"{metrics['overall']['inactive_instances']:,}"],
-            ["Total Hours", f"{metrics['overall']['total_hours']:.1f}"],
-            ["Hours for Instances with Modules", f"{metrics['overall']['activated_hours']:.1f}"],
-            ["Hours for Instances without Modules", f"{metrics['overall']['inactive_hours']:.1f}"],
+            ["Total Unique Instances", f"{overall['total_instances']:,}"],
+            ["Instances Running at Least One Module", f"{overall['activated_instances']:,}"],
+            ["Instances Not Running Any Modules", f"{overall['inactive_instances']:,}"],
+            ["Total Hours", f"{overall['total_hours']:.1f}"],
+            ["Hours for Instances with Modules", f"{overall['activated_hours']:.1f}"],
+            ["Hours for Instances without Modules", f"{overall['inactive_hours']:.1f}"],
             ["Max Concurrent Usage", f"{metrics['overall_metrics']['max_concurrent_overall']:,}"],
-            ["Unknown Environment Instances", f"{metrics['by_environment'].get('Unknown', {}).get('total_instances', 0):,}"]
+            ["Unknown Environment Instances", f"{(unknown or {}).get('total_instances', 0):,}"]
         ]
         table = _create_table(stats_data)
         story.append(table)
@@ -90,44 +115,44 @@ def generate_pdf_report(metrics: Dict, output_dir: Path, visualizations: Dict[st
         story.append(Paragraph("Monthly Data Analysis", styles['Heading2']))
         monthly_data = [
             ["Month", "Activated Instances", "Max Concurrent", "Avg Modules/Host", "Total Hours"]
-        ]
-        for month in metrics['monthly']['data']:
-            monthly_data.append([
+        ] + [
+            [
                 month['month'],
                 month['activated_instances'],
                 month['max_concurrent'],
                 f"{month['avg_modules_per_host']:.2f}",
                 f"{month['total_hours']:.1f}"
-            ])
+            ]
+            for month in monthly['data']
+        ]
         table = _create_table(monthly_data)
         story.append(table)
         story.append(Spacer(1, 24))
 
         # Data Gaps
-        if metrics['monthly']['data_gaps']:
+        if monthly['data_gaps']:
             story.append(Paragraph("Data Gaps Detected", styles['Heading2']))
-            for gap in metrics['monthly']['data_gaps']:
+            for gap in monthly['data_gaps']:
                 story.append(Paragraph(f"- {gap}", styles['Normal']))
             story.append(Spacer(1, 12))
 
         # Unknown Environment Analysis
-        if metrics['by_environment'].get('Unknown') and \
-           metrics['by_environment']['Unknown']['total_instances'] > 0:
+        if unknown and unknown['total_instances'] > 0:
             story.append(Paragraph("Unknown Environment Analysis", styles['Heading2']))
             story.append(Paragraph(
-                f"Number of hosts in unknown environment: {metrics['by_environment']['Unknown']['total_instances']:,}",
+                f"Number of hosts in unknown environment: {unknown['total_instances']:,}",
                 styles['Normal']
             ))
             story.append(Paragraph("Common patterns found in unknown hosts:", styles['Normal']))
-            for pattern in metrics['by_environment']['Unknown'].get('patterns', []):
+            for pattern in unknown.get('patterns', []):
                 story.append(Paragraph(f"- {pattern}", styles['Normal']))
             story.append(Spacer(1, 12))
 
         doc.build(story)
-        logger.info(f"✓ Saved PDF report to '{pdf_path}'")
+        logger.info("✓ Saved PDF report to '%s'", pdf_path)
 
     except Exception as e:
-        logger.error(f"Failed to create PDF report: {str(e)}")
+        logger.error("Failed to create PDF report: %s", e)
         raise
 
 def _create_table(data: list) -> Table:
@@ -141,41 +166,21 @@ def _create_table(data: list) -> Table:
         Table: Formatted ReportLab Table object
     """
     table = Table(data, hAlign='LEFT')
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-        ('TEXTCOLOR',(0,0),(-1,0),colors.whitesmoke),
-        ('ALIGN',(0,0),(-1,-1),'LEFT'),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0,0), (-1,0), 12),
-        ('BACKGROUND',(0,1),(-1,-1),colors.beige),
-        ('GRID', (0,0), (-1,-1), 1, colors.black),
-    ]))
+    table.setStyle(_TABLE_STYLE)
     return table
 
-def _add_visualizations(story: list, output_dir: Path, visualizations: Dict[str, plt.Figure]) -> None:
+def _add_visualizations(story: list, visualizations: Dict[str, bytes], styles: StyleSheet1) -> None:
     """
     Add visualization images to the PDF report.
 
     Args:
         story (list): List of PDF elements
-        output_dir (Path): Directory containing visualization images
-        visualizations (Dict[str, plt.Figure]): Dictionary of visualization figures
+        visualizations (Dict[str, bytes]): Dictionary of rendered PNG data of the visualizations
+        styles (StyleSheet1): Stylesheet of the report
     """
-    # Module Usage Image
-    if (output_dir / 'module_usage.png').exists():
-        img_path = output_dir / 'module_usage.png'
-        story.append(Image(str(img_path), width=6*inch, height=4*inch))
-        story.append(Spacer(1, 12))
-
-    # Environment Distribution Image
-    if (output_dir / 'environment_distribution.png').exists():
-        img_path = output_dir / 'environment_distribution.png'
-        story.append(Image(str(img_path), width=6*inch, height=6*inch))
-        story.append(Spacer(1, 12))
-
-    # Activated Instances Growth Image
-    if (output_dir / 'activated_instances_growth.png').exists():
-        img_path = output_dir / 'activated_instances_growth.png'
-        story.append(Paragraph("Growth of Activated Instances Over Time", getSampleStyleSheet()['Heading3']))
-        story.append(Image(str(img_path), width=6*inch, height=4*inch))
-        story.append(Spacer(1, 12))
+    for name, width, height, heading in _VISUALIZATION_LAYOUT:
+        if name in visualizations:
+            if heading:
+                story.append(Paragraph(heading, styles['Heading3']))
+            story.append(Image(io.BytesIO(visualizations[name]), width=width*inch, height=height*inch))
+            story.append(Spacer(1, 12))
@@ -7,6 +7,10 @@ from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Keys validate_metrics requires at the top level and in the overall metrics
+REQUIRED_METRIC_KEYS = frozenset(['overall', 'by_environment', 'monthly'])
+REQUIRED_OVERALL_KEYS = frozenset(['total_instances', 'activated_instances', 'inactive_instances'])
+
 def format_number(value: Any, decimal_places: Optional[int] = None) -> str:
     """
     Format a number with thousand separators and optional decimal places.
@@ -35,7 +39,7 @@ def ensure_output_directory(output_dir: Path) -> None:
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
     except Exception as e:
-        logger.error(f"Failed to create output directory: {str(e)}")
+        logger.error("Failed to create output directory: %s", e)
         raise
 
 def validate_metrics(metrics: Dict) -> bool:
@@ -48,16 +52,14 @@ def validate_metrics(metrics: Dict) -> bool:
     Returns:
         bool: True if metrics are valid, False otherwise
     """
-    required_keys = ['overall', 'by_environment', 'monthly']
-    
     try:
         # Check for required top-level keys
-        if not all(key in metrics for key in required_keys):
+        if not REQUIRED_METRIC_KEYS.issubset(metrics):
             logger.error("Missing required keys in metrics dictionary")
             return False
             
         # Validate overall metrics
-        if not all(key in metrics['overall'] for key in ['total_instances', 'activated_instances', 'inactive_instances']):
+        if not REQUIRED_OVERALL_KEYS.issubset(metrics['overall']):
             logger.error("Missing required overall metrics")
             return False
             
@@ -69,5 +71,5 @@ def validate_metrics(metrics: Dict) -> bool:
         return True
         
     except Exception as e:
-        logger.error(f"Error validating metrics: {str(e)}")
+        logger.error("Error validating metrics: %s", e)
         return False
@@ -1,12 +1,20 @@
 """
 Utility functions and constants for the Deep Security Usage Analyzer.
 """
-from typing import Dict, List, Optional, Union
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Optional, Union
+import json
+import math
 import pandas as pd
 import numpy as np
-import warnings
 import re
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
 # Valid file extensions for input data
 VALID_EXTENSIONS = {'.csv', '.xlsx', '.xls'}
 
@@ -51,7 +59,7 @@ DOMAIN_PATTERNS = {
     'Internal': [
         r'10\.\d+\.\d+\.\d+',
         r'192\.168\.\d+\.\d+',
-        r'172\.(1[6-9]|2[0-9]|3[0-1])\.\d+\.\d+',
+        r'172\.(?:1[6-9]|2[0-9]|3[0-1])\.\d+\.\d+',
         r'\.internal\.',
         r'\.local\.',
         r'\.intranet\.'
@@ -64,6 +72,10 @@ DOMAIN_PATTERNS = {
     ]
 }
 
+# Each environment's and domain's patterns combined into a single compiled alternation
+ENVIRONMENT_REGEXES = {env: re.compile('|'.join(patterns)) for env, patterns in ENVIRONMENT_PATTERNS.items()}
+DOMAIN_REGEXES = {domain: re.compile('|'.join(patterns)) for domain, patterns in DOMAIN_PATTERNS.items()}
+
 def classify_environment(hostname: str, source_env: Optional[str] = None) -> str:
     """
     Classify the environment of a given hostname based on predefined patterns.
@@ -81,24 +93,25 @@ def classify_environment(hostname: str, source_env: Optional[str] = None) -> str
     if pd.isna(hostname):
         return 'Unknown'
         
-    hostname = str(hostname).lower()
+    return _classify_hostname(str(hostname).lower())
+
+@lru_cache(maxsize=200_000)
+def _classify_hostname(hostname: str) -> str:
+    """
+    Classify a lowercased hostname, caching the result since hosts repeat across records.
+
+    Used by classify_environment and by classify_environments for the hostnames none of
+    the combined patterns match, so both apply the same fallback rules.
+    """
+    # Check specific environment patterns
+    for env, pattern in ENVIRONMENT_REGEXES.items():
+        if pattern.search(hostname):
+            return env
     
-    # Suppress the specific warning about regex pattern groups
-    with warnings.catch_warnings():
-        warnings.filterwarnings('ignore', category=UserWarning, 
-                              message='This pattern is interpreted as a regular expression, and has match groups.*')
-        
-        # Check specific environment patterns
-        for env, patterns in ENVIRONMENT_PATTERNS.items():
-            if any(pattern in hostname or pd.Series(hostname).str.contains(pattern, regex=True).iloc[0] 
-                   for pattern in patterns):
-                return env
-        
-        # Check domain patterns
-        for domain, patterns in DOMAIN_PATTERNS.items():
-            if any(pd.Series(hostname).str.contains(pattern, regex=True).iloc[0] 
-                   for pattern in patterns):
-                return domain
+    # Check domain patterns
+    for domain, pattern in DOMAIN_REGEXES.items():
+        if pattern.search(hostname):
+            return domain
     
     # Additional classification based on naming conventions
     if any(x in hostname for x in ['app', 'api', 'web', 'srv']):
@@ -121,30 +134,101 @@ def classify_environment(hostname: str, source_env: Optional[str] = None) -> str
     
     return 'Unknown'
 
-def convert_to_serializable(obj: Union[Dict, List, np.integer, np.floating, np.bool_, pd.Timestamp]) -> Union[Dict, List, int, float, bool, str]:
+def classify_environments(hostnames: pd.Series, source_envs: pd.Series) -> pd.Series:
     """
-    Recursively convert NumPy data types to native Python types.
-    
+    Classify the environment of every hostname in a Series based on predefined patterns.
+
+    Gives the same results as classify_environment applied row by row, but classifies each
+    distinct hostname once and matches each combined pattern against all of them at once.
+    Hostnames no pattern matches are classified by classify_environment's own rules.
+
     Args:
-        obj: The object to convert.
-        
+        hostnames (pd.Series): The hostnames to classify.
+        source_envs (pd.Series): The environments inferred from the filenames, aligned with hostnames.
+
     Returns:
-        The converted object with native Python types.
+        pd.Series: The classified environment names, aligned with hostnames.
     """
+    environments = pd.Series('Unknown', index=hostnames.index, dtype=object)
+    
+    # The environment inferred from the filename takes precedence
+    has_source = source_envs.notna() & source_envs.astype(bool)
+    environments[has_source] = source_envs[has_source]
+    
+    pending = hostnames.notna() & ~has_source
+    if not pending.any():
+        return environments
+    pending_hosts = hostnames[pending].astype(str).str.lower()
+    
+    # Classify each distinct hostname, taking the first environment or domain that matches
+    remaining = pd.Series(pending_hosts.unique())
+    env_by_host = pd.Series('Unknown', index=remaining.to_numpy(), dtype=object)
+    for env, pattern in [*ENVIRONMENT_REGEXES.items(), *DOMAIN_REGEXES.items()]:
+        matched = remaining.str.contains(pattern)
+        env_by_host[remaining[matched].to_numpy()] = env
+        remaining = remaining[~matched]
+    
+    # Hostnames no pattern matches go through the same fallback rules as classify_environment
+    env_by_host[remaining.to_numpy()] = remaining.map(_classify_hostname).to_numpy()
+
+    environments[pending] = pending_hosts.map(env_by_host)
+    return environments
+
+def _nan_to_none(obj: Any) -> Any:
+    """Replace NaN and infinite floats in plain containers with None, as orjson writes them as null."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
     if isinstance(obj, dict):
-        return {k: convert_to_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_to_serializable(item) for item in obj]
-    elif isinstance(obj, np.integer):
+        return {key: _nan_to_none(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_nan_to_none(value) for value in obj]
+    return obj
+
+def _json_default(obj: Any) -> Union[int, float, bool, str, List, None]:
+    """
+    Convert values the JSON encoders do not handle natively (NumPy and pandas types).
+
+    Only called for values the encoder cannot serialize itself, so with orjson plain
+    containers are never walked in Python.
+
+    Args:
+        obj: The value to convert.
+
+    Returns:
+        The value as a native Python type.
+    """
+    if isinstance(obj, np.integer):
         return int(obj)
     elif isinstance(obj, np.floating):
-        return float(obj)
+        return _nan_to_none(float(obj))
     elif isinstance(obj, np.bool_):
         return bool(obj)
+    elif isinstance(obj, np.ndarray):
+        return _nan_to_none(obj.tolist())
     elif isinstance(obj, pd.Timestamp):
         return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def write_json(data: Any, path: Path) -> None:
+    """
+    Write data to a JSON file, using orjson when it is installed.
+
+    Both encoders write the same JSON: indented by two spaces, with NaN and infinite values as null.
+
+    Args:
+        data: Data to write; NumPy scalars and arrays and pandas Timestamps are converted as needed.
+        path (Path): Destination file path.
+    """
+    if orjson is not None:
+        with open(path, 'wb') as json_file:
+            json_file.write(orjson.dumps(
+                data,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ))
     else:
-        return obj
+        with open(path, 'w') as json_file:
+            json.dump(_nan_to_none(data), json_file, indent=2, default=_json_default, allow_nan=False)
 
 def filter_time_range(df: pd.DataFrame, start_date: Optional[pd.Timestamp] = None, end_date: Optional[pd.Timestamp] = None) -> pd.DataFrame:
     """
@@ -161,21 +245,26 @@ def filter_time_range(df: pd.DataFrame, start_date: Optional[pd.Timestamp] = Non
     if not isinstance(df, pd.DataFrame):
         raise ValueError("Input must be a pandas DataFrame")
 
-    filtered_df = df.copy()
+    # Build one mask for both bounds so the frame is only copied once, by the final selection
+    keep = np.ones(len(df), dtype=bool)
     
     if start_date:
         # Remove records that end before start_date
-        filtered_df = filtered_df[filtered_df['stop_datetime'] >= start_date]
-        # Adjust start times that are before start_date
-        filtered_df.loc[filtered_df['start_datetime'] < start_date, 'start_datetime'] = start_date
+        keep &= (df['stop_datetime'] >= start_date).to_numpy()
         
     if end_date:
         # Set end_date to 23:59:59 of the last day
         end_date_with_time = pd.to_datetime(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
         # Remove records that start after end_date
-        filtered_df = filtered_df[filtered_df['start_datetime'] <= end_date_with_time]
-        # Adjust stop times that are after end_date
-        filtered_df.loc[filtered_df['stop_datetime'] > end_date_with_time, 'stop_datetime'] = end_date_with_time
+        keep &= (df['start_datetime'] <= end_date_with_time).to_numpy()
+    
+    filtered_df = df[keep]
+    
+    # Adjust start times that are before start_date and stop times that are after end_date
+    if start_date:
+        filtered_df['start_datetime'] = filtered_df['start_datetime'].clip(lower=start_date)
+    if end_date:
+        filtered_df['stop_datetime'] = filtered_df['stop_datetime'].clip(upper=end_date_with_time)
     
     # Recalculate duration if needed
     if 'Duration (Seconds)' in filtered_df.columns:
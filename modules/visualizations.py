@@ -1,17 +1,47 @@
 """
 Visualization creation functionality for the Deep Security Usage Analyzer.
 """
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # Charts are only written to files, so never load an interactive backend
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import seaborn as sns
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import logging
 from pathlib import Path
 
+from .utils import MODULE_COLUMNS
+
 logger = logging.getLogger(__name__)
 
-def create_visualizations(metrics: Dict, output_dir: Path) -> Dict[str, plt.Figure]:
+# Set the Seaborn style and resolve the color palettes once for all charts
+sns.set_style('darkgrid')
+_BAR_PALETTE = tuple(sns.color_palette("Set2"))
+_PIE_PALETTE = tuple(sns.color_palette("pastel"))
+
+# Environments shown in the module usage chart, in stacking order
+_CHART_ENVIRONMENTS = ('Production', 'Development', 'Test', 'Staging', 'Integration', 'DR', 'UAT')
+
+def _parse_month(month: str) -> datetime:
+    """Parse a 'YYYY-MM' month string into the datetime of its first day."""
+    return datetime(int(month[:4]), int(month[5:7]), 1)
+
+def _render_png(fig: Figure) -> bytes:
+    """Render a finished figure to PNG data."""
+    buffer = io.BytesIO()
+    # Use zlib's fastest level: the HTML report re-encodes the charts as WebP and ReportLab
+    # recompresses them for the PDF, so a higher level only slows down rendering
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight', facecolor='white', edgecolor='none',
+                pil_kwargs={'compress_level': 1})
+    return buffer.getvalue()
+
+def create_visualizations(metrics: Dict, output_dir: Path) -> Dict[str, bytes]:
     """
     Create visualizations to represent module usage, environment distribution, and growth of activated instances.
 
@@ -20,63 +50,62 @@ def create_visualizations(metrics: Dict, output_dir: Path) -> Dict[str, plt.Figu
         output_dir (Path): Directory to save the visualization files
 
     Returns:
-        Dict[str, plt.Figure]: A dictionary of visualization figures
+        Dict[str, bytes]: A dictionary of the rendered PNG data of each visualization
     """
     visualizations = {}
     
     try:
-        # Set Seaborn style
-        sns.set_style('darkgrid')
-        
-        # Define a color palette for consistency
-        color_palette = sns.color_palette("Set2")
-        
         # 1. Security Module Usage by Environment (Stacked Bar Chart)
-        fig1, ax1 = plt.subplots(figsize=(12, 8))
-        module_cols = ['AM', 'WRS', 'DC', 'AC', 'IM', 'LI', 'FW', 'DPI', 'SAP']
-        env_data = {}
-        for env in ['Production', 'Development', 'Test', 'Staging', 'Integration', 'DR', 'UAT']:
-            if env in metrics['by_environment']:
-                env_data[env] = metrics['by_environment'][env]['module_usage']
-        module_usage_df = pd.DataFrame(env_data).fillna(0)
-        module_usage_df = module_usage_df[module_usage_df.columns[::-1]]  # Reverse for better stacking
-        module_usage_df.plot(kind='bar', stacked=True, ax=ax1, color=color_palette[:len(module_cols)])
+        fig1 = Figure(figsize=(12, 8))
+        ax1 = fig1.add_subplot()
+        module_cols = MODULE_COLUMNS
+        envs = [env for env in _CHART_ENVIRONMENTS if env in metrics['by_environment']]
+        usage_counts = np.zeros((len(module_cols), len(envs)), dtype=np.int64)
+        for j, env in enumerate(envs):
+            env_usage = metrics['by_environment'][env]['module_usage']
+            usage_counts[:, j] = [env_usage.get(module, 0) for module in module_cols]
+        # Reverse the environments for better stacking
+        module_usage_df = pd.DataFrame(usage_counts[:, ::-1], index=module_cols, columns=envs[::-1])
+        module_usage_df.plot(kind='bar', stacked=True, ax=ax1, color=list(_BAR_PALETTE[:len(module_cols)]))
         ax1.set_title('Security Module Usage Across Environments', fontsize=16, pad=20)
         ax1.set_xlabel('Security Modules', fontsize=12)
         ax1.set_ylabel('Usage Count', fontsize=12)
         ax1.legend(title='Environment', bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        ax1.tick_params(axis='x', labelrotation=45)
+        fig1.tight_layout()
         visualizations['module_usage'] = fig1
 
         # 2. Environment Distribution (Pie Chart)
-        fig2, ax2 = plt.subplots(figsize=(8, 8))
-        env_counts = pd.Series(metrics['overall']['environment_distribution'])
+        fig2 = Figure(figsize=(8, 8))
+        ax2 = fig2.add_subplot()
+        env_distribution = metrics['overall']['environment_distribution']
+        env_labels = list(env_distribution)
+        env_counts = np.fromiter(env_distribution.values(), dtype=np.float64, count=len(env_distribution))
         if env_counts.sum() > 0:  # Ensure we have data to plot
-            colors_env = sns.color_palette("pastel")[0:len(env_counts)]
-            wedges, texts, autotexts = ax2.pie(env_counts.values, 
-                                              labels=env_counts.index, 
+            colors_env = _PIE_PALETTE[:len(env_counts)]
+            wedges, texts, autotexts = ax2.pie(env_counts, 
+                                              labels=env_labels, 
                                               autopct='%1.1f%%',
                                               colors=colors_env, 
                                               startangle=140)
             ax2.set_title('Distribution of Activated Instances by Environment', fontsize=16)
             # Enhance legend readability
-            legend_labels = [f'{env}' for env in env_counts.index]
-            ax2.legend(wedges, legend_labels,
+            ax2.legend(wedges, env_labels,
                       title="Environments",
                       loc="center left",
                       bbox_to_anchor=(1, 0, 0.5, 1))
         else:
             ax2.text(0.5, 0.5, 'No activated instances found',
                      ha='center', va='center')
-        plt.tight_layout()
+        fig2.tight_layout()
         visualizations['environment_distribution'] = fig2
 
         # 3. Growth of Activated Instances Over Time (Line Chart)
         if 'monthly' in metrics and 'data' in metrics['monthly']:
-            fig3, ax3 = plt.subplots(figsize=(12, 6))
+            fig3 = Figure(figsize=(12, 6))
+            ax3 = fig3.add_subplot()
             monthly_data = sorted(metrics['monthly']['data'], key=lambda x: x['month'])
-            months = [datetime.strptime(month['month'], '%Y-%m') for month in monthly_data]
+            months = [_parse_month(month['month']) for month in monthly_data]
             activated_instances = [month['activated_instances'] for month in monthly_data]
             
             # Plot cumulative growth
@@ -91,17 +120,22 @@ def create_visualizations(metrics: Dict, output_dir: Path) -> Dict[str, plt.Figu
             ax3.set_title('Total Activated Instances Seen by Month', fontsize=16, pad=20)
             ax3.set_xlabel('Month', fontsize=12)
             ax3.set_ylabel('Total Activated Instances', fontsize=12)
-            ax3.xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%Y-%m'))
-            plt.xticks(rotation=45)
-            plt.tight_layout()
+            ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+            ax3.tick_params(axis='x', labelrotation=45)
+            fig3.tight_layout()
             visualizations['activated_instances_growth'] = fig3
         else:
             logger.warning("Monthly data not available. Skipping 'activated_instances_growth' visualization.")
 
-        # Save all visualizations
-        for name, fig in visualizations.items():
+        # Render each visualization to PNG once, keeping the data for the reports and saving it to disk.
+        # The figures are independent and fully built, so they are rendered concurrently.
+        with ThreadPoolExecutor(max_workers=min(len(visualizations), os.cpu_count() or 1)) as executor:
+            png_images = dict(zip(visualizations, executor.map(_render_png, visualizations.values())))
+        
+        for name in png_images:
             fig_path = output_dir / f'{name}.png'
-            fig.savefig(fig_path, dpi=300, bbox_inches='tight', facecolor='white', edgecolor='none')
+            with open(fig_path, 'wb') as png_file:
+                png_file.write(png_images[name])
             logger.debug(f"Saved visualization '{name}' to '{fig_path}'")
         
         print(f"✓ Created {len(visualizations)} visualizations:")
@@ -112,4 +146,4 @@ def create_visualizations(metrics: Dict, output_dir: Path) -> Dict[str, plt.Figu
         logger.error(f"Error creating visualizations: {str(e)}")
         raise
     
-    return visualizations
+    return png_images